@@ -1,18 +1,23 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, File, UploadFile, Form, Header, HTTPException, Query
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.requests import Request
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import uvicorn
+import asyncio
 import os
+import shutil
 from pathlib import Path
 
 from download_models import download_models
 from model_utils import ClothingClassifier
 from color_extractor import ColorExtractor
 from gemini_service import GeminiStyleAdvisor
+from job_queue import JobQueue
+from profiling import RequestProfiler, stage as profile_stage
+from traffic_capture import TrafficRecorder
+from static_assets import StaticAssetManager, CompressedAsset, REVALIDATE_CACHE
 
 # Download models from Google Drive if not exists
 print("Initializing application...")
@@ -20,9 +25,25 @@ download_models()
 
 app = FastAPI(title="Winter Outfit Wizard")
 
+# 요청 프로파일링 (환경 변수로 켠 경우에만 미들웨어 등록)
+profiler = RequestProfiler(paths=("/api/analyze", "/api/re-recommend"))
+if profiler.enabled:
+    app.middleware("http")(profiler.middleware)
+    print(f"✓ 요청 프로파일링 활성화 (샘플링 비율: {profiler.sample_rate})")
+
+# 성능 회귀 테스트용 요청 기록 (CAPTURE_DIR 설정 시에만)
+traffic_recorder = TrafficRecorder.from_env()
+if traffic_recorder:
+    print(f"✓ 요청 기록 활성화: {traffic_recorder.capture_dir}")
+
 # Static files and templates
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# 정적 파일은 시작 시 지문 부여 + gzip/brotli 사전 압축 후 메모리에서 서빙
+static_assets = StaticAssetManager(directory="static", url_prefix="/static")
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static_url"] = static_assets.url
+
+# 렌더링된 메인 페이지 캐시 (출력이 요청과 무관하므로 한 번만 렌더링)
+_index_page: Optional[CompressedAsset] = None
 
 # Initialize services
 classifier = ClothingClassifier()
@@ -33,11 +54,110 @@ gemini_advisor = GeminiStyleAdvisor()
 UPLOAD_FOLDER = Path("uploads")
 UPLOAD_FOLDER.mkdir(exist_ok=True)
 
+# 비동기 분석 작업 큐 (SQLite에 영속 저장)
+job_queue = JobQueue(
+    db_path=os.getenv("JOB_DB_PATH", "jobs/jobs.db"),
+    workers=int(os.getenv("JOB_WORKERS", "2"))
+)
+
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """메인 페이지"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    global _index_page
+    if _index_page is None:
+        html = templates.get_template("index.html").render()
+        _index_page = CompressedAsset(html.encode("utf-8"), "text/html; charset=utf-8")
+    return _index_page.respond(request, REVALIDATE_CACHE)
+
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+async def static_files(request: Request, path: str):
+    """정적 파일 (지문 경로는 immutable 캐시)"""
+    return static_assets.response(request, path)
+
+
+CATEGORIES = ["outer", "inner1", "inner2", "bottom"]
+
+
+async def save_uploads(files: Dict[str, Optional[UploadFile]],
+                       folder: Path) -> Tuple[Dict[str, str], Dict[str, Tuple[bytes, str]]]:
+    """업로드 파일 저장 후 ({카테고리: 저장 경로}, {카테고리: (내용, 확장자)}) 반환
+    
+    내용은 요청 기록용. 저장 경로는 같은 파일명의 다른 요청이 덮어쓸 수 있으므로
+    나중에 다시 읽지 말고 이 값을 사용.
+    """
+    image_paths = {}
+    images = {}
+    for category, file in files.items():
+        if file and file.filename:
+            folder.mkdir(parents=True, exist_ok=True)
+            file_path = folder / f"{category}_{Path(file.filename).name}"
+            with profile_stage("upload_save"):
+                content = await file.read()
+                with open(file_path, "wb") as f:
+                    f.write(content)
+            image_paths[category] = str(file_path)
+            images[category] = (content, file_path.suffix.lower())
+    return image_paths, images
+
+
+def analyze_items(image_paths: Dict[str, str]) -> Dict[str, Any]:
+    """저장된 옷 이미지 분석 (ML 분류 + 색상 추출)"""
+    uploaded_items = {}
+    
+    for category in CATEGORIES:
+        if category not in image_paths:
+            continue
+        file_path = image_paths[category]
+        
+        # 옷 종류 및 무늬 분석 (ML 모델)
+        clothing_type = classifier.classify_item(file_path, category)
+        pattern = classifier.classify_pattern(file_path)
+        
+        # 색상 추출 (OpenCV)
+        colors = color_extractor.extract_dominant_colors(file_path)
+        
+        uploaded_items[category] = {
+            "type": clothing_type,
+            "colors": colors,
+            "pattern": pattern,
+            "image_path": file_path
+        }
+        
+        print(f"✓ {category} 처리 완료 - 색상: {colors}")
+    
+    return uploaded_items
+
+
+async def build_analysis_response(user_info: Dict[str, Any], uploaded_items: Dict[str, Any]) -> Dict[str, Any]:
+    """Gemini 추천을 받아 최종 응답 데이터 구성"""
+    # Gemini API로 코디 추천
+    print(f"\n📊 Gemini API 호출 시작...")
+    print(f"   사용자 정보: {user_info}")
+    print(f"   업로드된 아이템: {list(uploaded_items.keys())}")
+    
+    recommendation = await gemini_advisor.get_recommendation(
+        user_info=user_info,
+        uploaded_items=uploaded_items
+    )
+    
+    print(f"✓ Gemini 추천 완료")
+    print(f"   추천 항목 수: {len(recommendation.get('recommendations', {}))}")
+    
+    # 최종 응답 데이터 로깅
+    response_data = {
+        "success": True,
+        "user_info": user_info,
+        "uploaded_items": uploaded_items,
+        "recommendation": recommendation
+    }
+    print(f"\n📤 클라이언트로 전송하는 데이터:")
+    print(f"   uploaded_items 키: {list(uploaded_items.keys())}")
+    for cat, item in uploaded_items.items():
+        print(f"   {cat}: colors={item.get('colors')}")
+    
+    return response_data
 
 
 @app.post("/api/analyze")
@@ -55,76 +175,155 @@ async def analyze_outfit(
     사용자 입력 분석 및 코디 추천
     """
     try:
-        # 업로드된 옷 분석
-        uploaded_items = {}
-        
-        for category, file in [("outer", outer), ("inner1", inner1), ("inner2", inner2), ("bottom", bottom)]:
-            if file and file.filename:
-                # 파일 저장
-                file_path = UPLOAD_FOLDER / f"{category}_{file.filename}"
-                content = await file.read()
-                with open(file_path, "wb") as f:
-                    f.write(content)
-                
-                # 옷 종류 및 무늬 분석 (ML 모델)
-                clothing_type = classifier.classify_item(str(file_path), category)
-                pattern = classifier.classify_pattern(str(file_path))
-                
-                # 색상 추출 (OpenCV)
-                colors = color_extractor.extract_dominant_colors(str(file_path))
-                
-                uploaded_items[category] = {
-                    "type": clothing_type,
-                    "colors": colors,
-                    "pattern": pattern,
-                    "image_path": str(file_path)
-                }
-                
-                print(f"✓ {category} 처리 완료 - 색상: {colors}")
+        # 업로드된 옷 저장 및 분석
+        image_paths, images = await save_uploads(
+            {"outer": outer, "inner1": inner1, "inner2": inner2, "bottom": bottom},
+            UPLOAD_FOLDER
+        )
         
         # 사용자 정보
         user_info = {
             "gender": gender,
-            "age_group": age_group,            'body_type': body_type,            "tpo": tpo
+            "age_group": age_group,
+            "body_type": body_type,
+            "tpo": tpo
         }
         
-        # Gemini API로 코디 추천
-        print(f"\n📊 Gemini API 호출 시작...")
-        print(f"   사용자 정보: {user_info}")
-        print(f"   업로드된 아이템: {list(uploaded_items.keys())}")
-        
-        recommendation = await gemini_advisor.get_recommendation(
-            user_info=user_info,
-            uploaded_items=uploaded_items
-        )
-        
-        print(f"✓ Gemini 추천 완료")
-        print(f"   추천 항목 수: {len(recommendation.get('recommendations', {}))}")
+        if traffic_recorder:
+            traffic_recorder.record_analyze(user_info, images)
         
-        # 최종 응답 데이터 로깅
-        response_data = {
-            "success": True,
-            "user_info": user_info,
-            "uploaded_items": uploaded_items,
-            "recommendation": recommendation
-        }
-        print(f"\n📤 클라이언트로 전송하는 데이터:")
-        print(f"   uploaded_items 키: {list(uploaded_items.keys())}")
-        for cat, item in uploaded_items.items():
-            print(f"   {cat}: colors={item.get('colors')}")
+        uploaded_items = analyze_items(image_paths)
         
+        response_data = await build_analysis_response(user_info, uploaded_items)
         return JSONResponse(content=response_data)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def run_analysis_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """작업 큐 워커에서 실행되는 분석 (ML 분석은 스레드 풀에서 실행)"""
+    loop = asyncio.get_running_loop()
+    uploaded_items = await loop.run_in_executor(None, analyze_items, payload["image_paths"])
+    return await build_analysis_response(payload["user_info"], uploaded_items)
+
+
+def remove_job_uploads(job_id: str):
+    """완료/실패한 작업의 업로드 폴더 삭제
+    
+    업로드 이미지는 분석에만 쓰고 제공하지 않으므로 작업이 끝나면 바로 삭제.
+    저장된 결과의 image_path는 참고용 경로일 뿐 파일은 남아 있지 않음.
+    """
+    shutil.rmtree(UPLOAD_FOLDER / "jobs" / job_id, ignore_errors=True)
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    await job_queue.start(run_analysis_job, on_finish=remove_job_uploads)
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_queue.stop()
+
+
+@app.post("/api/jobs/analyze", status_code=202)
+async def submit_analyze_job(
+    gender: str = Form(...),
+    age_group: str = Form(...),
+    body_type: str = Form(...),
+    tpo: str = Form(...),
+    outer: Optional[UploadFile] = File(None),
+    inner1: Optional[UploadFile] = File(None),
+    inner2: Optional[UploadFile] = File(None),
+    bottom: Optional[UploadFile] = File(None),
+    idempotency_key: Optional[str] = Header(None),
+):
+    """
+    분석 작업 등록 후 job_id 즉시 반환
+    
+    같은 Idempotency-Key 헤더로 재시도하면 기존 작업을 그대로 반환.
+    """
+    if idempotency_key:
+        existing = job_queue.find_by_key(idempotency_key)
+        if existing:
+            return existing
+    
+    job_id = job_queue.new_job_id()
+    image_paths, _ = await save_uploads(
+        {"outer": outer, "inner1": inner1, "inner2": inner2, "bottom": bottom},
+        UPLOAD_FOLDER / "jobs" / job_id
+    )
+    payload = {
+        "user_info": {
+            "gender": gender,
+            "age_group": age_group,
+            "body_type": body_type,
+            "tpo": tpo
+        },
+        "image_paths": image_paths
+    }
+    
+    job = job_queue.submit(job_id, payload, idempotency_key)
+    if job["job_id"] != job_id:
+        # 동시에 들어온 같은 키의 요청이 먼저 등록됨
+        remove_job_uploads(job_id)
+    return job
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=30)):
+    """
+    작업 상태/결과 조회 (wait초 동안 완료를 기다리는 long-poll 지원, 최대 30초)
+    """
+    job = await job_queue.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
+
+
 @app.get("/api/health")
 async def health_check():
     """서버 상태 확인"""
     return {"status": "healthy", "service": "Winter Outfit Wizard"}
 
 
+@app.get("/api/cascade-stats")
+async def cascade_stats():
+    """분류 캐스케이드 카테고리별 승격률"""
+    return classifier.cascade_summary()
+
+
+def require_profile_token(request: Request):
+    """프로파일 조회 권한 확인 (PROFILE_TOKEN 미설정 시 엔드포인트 비활성)"""
+    if not profiler.authorized(request):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@app.get("/api/admin/profiles")
+async def list_profiles(request: Request):
+    """최근 프로파일 목록"""
+    require_profile_token(request)
+    return {"profiles": [profile.summary() for profile in reversed(profiler.profiles)]}
+
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def get_profile(request: Request, profile_id: str, format: str = "json"):
+    """
+    프로파일 상세 조회
+    
+    format=collapsed: flamegraph.pl / speedscope용 collapsed stack 텍스트
+    format=json: 단계별 시간 및 tracemalloc 메모리 변화
+    """
+    require_profile_token(request)
+    profile = profiler.find(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return profile.to_dict()
+
+
 # 재추천 요청 모델
 class ReRecommendRequest(BaseModel):
     user_info: Dict[str, Any]
@@ -141,6 +340,9 @@ async def re_recommend(request: ReRecommendRequest):
         print(f"   User info: {request.user_info}")
         print(f"   Items: {list(request.uploaded_items.keys())}")
         
+        if traffic_recorder:
+            traffic_recorder.record_re_recommend(request.model_dump())
+        
         # Gemini에 재추천 요청
         recommendation = await gemini_advisor.get_recommendation(
             request.user_info,
@@ -0,0 +1,124 @@
+"""
+이미지 전처리 벤치마크 - 기존 float 경로 vs uint8 경로 (+ 참고용 JPEG draft 디코딩)
+
+경로마다 새 하위 프로세스에서 실행하여 시간과 최대 RSS(ru_maxrss)를 측정.
+tracemalloc과 달리 Pillow의 C 디코딩 버퍼까지 포함됨.
+
+사용법: python benchmark_preprocess.py [이미지 경로] [반복 횟수]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+INPUT_SIZE = (224, 224)
+
+
+def preprocess_float(image_path, out=None):
+    """기존 방식: float64 정규화 후 Keras가 float32로 다시 변환"""
+    img = Image.open(image_path).convert('RGB')
+    img = img.resize(INPUT_SIZE)
+    img_array = np.array(img) / 255.0
+    img_array = np.expand_dims(img_array, axis=0)
+    return img_array.astype(np.float32)  # model.predict 내부 변환과 동일
+
+
+def preprocess_uint8(image_path, out):
+    """현재 방식: 재사용 uint8 버퍼에 그대로 채움 (정규화는 모델 그래프 안에서)"""
+    img = Image.open(image_path).convert('RGB')
+    img = img.resize(INPUT_SIZE)
+    out[0] = np.asarray(img, dtype=np.uint8)
+    return out
+
+
+def preprocess_uint8_draft(image_path, out):
+    """참고용: JPEG DCT 축소 디코딩 (모델 입력 픽셀이 달라지므로 서버에는 미적용)"""
+    img = Image.open(image_path)
+    img.draft('RGB', INPUT_SIZE)
+    img = img.convert('RGB').resize(INPUT_SIZE)
+    out[0] = np.asarray(img, dtype=np.uint8)
+    return out
+
+
+VARIANTS = {
+    "float": preprocess_float,
+    "uint8": preprocess_uint8,
+    "uint8+draft": preprocess_uint8_draft,
+}
+
+
+def max_rss_kib():
+    """현재 프로세스의 최대 RSS (KiB, Linux 기준)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_worker(variant, image_path, iterations):
+    """하위 프로세스: 한 경로만 실행하고 결과를 JSON으로 출력"""
+    fn = VARIANTS[variant]
+    buffer = np.empty((1, *INPUT_SIZE, 3), dtype=np.uint8)
+    rss_before = max_rss_kib()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(image_path, buffer)
+    elapsed = (time.perf_counter() - start) / iterations
+
+    print(json.dumps({
+        "ms": elapsed * 1000,
+        "peak_rss_kib": max_rss_kib(),
+        "rss_growth_kib": max_rss_kib() - rss_before,
+    }))
+
+
+def measure(variant, image_path, iterations):
+    output = subprocess.run(
+        [sys.executable, __file__, "--worker", variant, image_path, str(iterations)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    print(f"{variant:>12}: {result['ms']:7.3f} ms/image, "
+          f"최대 RSS {result['peak_rss_kib'] / 1024:7.1f} MiB "
+          f"(전처리 중 증가 {result['rss_growth_kib'] / 1024:6.1f} MiB)")
+    return result
+
+
+def compare_pixels(image_path):
+    """draft 디코딩이 모델 입력 픽셀을 얼마나 바꾸는지"""
+    a = preprocess_uint8(image_path, np.empty((1, *INPUT_SIZE, 3), dtype=np.uint8)).astype(np.int16)
+    b = preprocess_uint8_draft(image_path, np.empty((1, *INPUT_SIZE, 3), dtype=np.uint8)).astype(np.int16)
+    diff = np.abs(a - b)
+    print(f"draft 픽셀 차이: 평균 {diff.mean():.2f}, 최대 {diff.max()} (0~255)")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        run_worker(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if len(sys.argv) > 1:
+            image_path = sys.argv[1]
+        else:
+            # 테스트용 이미지 생성 (일반적인 휴대폰 사진 크기)
+            image_path = os.path.join(tmp_dir, "benchmark.jpg")
+            rng = np.random.default_rng(42)
+            Image.fromarray(rng.integers(0, 256, (1512, 2016, 3), dtype=np.uint8)).save(image_path)
+
+        print(f"이미지: {image_path}, 반복: {iterations}회")
+        results = {variant: measure(variant, image_path, iterations) for variant in VARIANTS}
+        compare_pixels(image_path)
+
+    before, after = results["float"], results["uint8"]
+    print(f"uint8 경로: 시간 {before['ms'] / after['ms']:.2f}x, "
+          f"최대 RSS {(before['peak_rss_kib'] - after['peak_rss_kib']) / 1024:.1f} MiB 감소")
+
+
+if __name__ == "__main__":
+    main()
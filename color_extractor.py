@@ -3,6 +3,8 @@ import numpy as np
 from sklearn.cluster import KMeans
 from collections import Counter
 
+from profiling import stage as profile_stage
+
 
 class ColorExtractor:
     """OpenCV를 사용한 색상 추출기"""
@@ -30,7 +32,8 @@ class ColorExtractor:
         """주요 색상 추출 (K-means 클러스터링)"""
         try:
             # 이미지 읽기
-            image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+            with profile_stage("cv2_decode"):
+                image = cv2.imread(image_path, cv2.IMREAD_COLOR)
             if image is None:
                 print(f"⚠ 이미지 읽기 실패: {image_path}")
                 # WebP 등 특수 형식은 imdecode로 시도
@@ -38,7 +41,8 @@ class ColorExtractor:
                     import numpy as np
                     with open(image_path, 'rb') as f:
                         image_data = f.read()
-                    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+                    with profile_stage("cv2_decode"):
+                        image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
                     if image is None:
                         return [{"name": "색상 추출 실패", "rgb": [128, 128, 128], "percentage": 100}]
                 except Exception as e:
@@ -53,7 +57,8 @@ class ColorExtractor:
             
             # K-means 클러스터링으로 주요 색상 찾기
             kmeans = KMeans(n_clusters=n_colors, random_state=42, n_init=10)
-            kmeans.fit(pixels)
+            with profile_stage("kmeans"):
+                kmeans.fit(pixels)
             
             # 클러스터 중심 (주요 색상)
             colors = kmeans.cluster_centers_
@@ -0,0 +1,119 @@
+"""
+캐스케이드 평가 - 카테고리별 승격률과 정확도 영향 측정 및 임계값 보정
+
+사용법: python evaluate_cascade.py <평가 데이터셋 경로> [--max-drop 1.0] [--write]
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# 경량 모델까지 로드하도록 캐스케이드 모드 강제
+os.environ["CLASSIFIER_CASCADE"] = "1"
+
+from model_utils import ClothingClassifier, DEFAULT_CASCADE_THRESHOLD
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+CANDIDATE_THRESHOLDS = [round(t, 2) for t in np.arange(0.5, 1.0, 0.05)] + [0.97, 0.99]
+
+
+def collect_predictions(classifier, category_dir):
+    """평가 이미지마다 (정답, 경량 확률, 전체 확률) 수집
+    
+    정답 인덱스는 평가 폴더 순서가 아니라 학습 클래스 순서(class_folders) 기준.
+    일부 클래스 폴더가 없어도 되지만, 모르는 폴더가 있으면 중단.
+    """
+    category = Path(category_dir).name
+    class_folders = classifier.class_folders[category]
+    class_dirs = sorted(d for d in Path(category_dir).iterdir() if d.is_dir())
+    unknown = [d.name for d in class_dirs if d.name not in class_folders]
+    if unknown:
+        raise ValueError(f"{category}: 학습 클래스에 없는 폴더 {unknown} (허용: {class_folders})")
+    missing = [name for name in class_folders if name not in {d.name for d in class_dirs}]
+    if missing:
+        print(f"⚠ {category} 평가 데이터에 없는 클래스: {missing}")
+    
+    results = []
+    for class_dir in class_dirs:
+        class_index = class_folders.index(class_dir.name)
+        for image_path in sorted(class_dir.iterdir()):
+            if image_path.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            img_array = classifier.preprocess_image(str(image_path))
+            if img_array is None:
+                continue
+            fast = classifier.fast_models[category].predict(img_array, verbose=0)[0]
+            full = classifier.models[category].predict(img_array, verbose=0)[0]
+            results.append((class_index, fast, full))
+    return results
+
+
+def evaluate_threshold(results, threshold):
+    """임계값 하나에 대한 (승격률, 캐스케이드 정확도)"""
+    escalated = 0
+    correct = 0
+    for label, fast, full in results:
+        if float(np.max(fast)) >= threshold:
+            correct += int(np.argmax(fast) == label)
+        else:
+            escalated += 1
+            correct += int(np.argmax(full) == label)
+    return escalated / len(results), correct / len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐스케이드 승격률/정확도 평가")
+    parser.add_argument("data_dir", help="카테고리/클래스별 평가 이미지 폴더")
+    parser.add_argument("--max-drop", type=float, default=1.0,
+                        help="허용할 정확도 하락 (%%p)")
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--write", action="store_true",
+                        help="보정된 임계값을 cascade_thresholds.json에 저장")
+    args = parser.parse_args()
+
+    classifier = ClothingClassifier(model_dir=args.model_dir)
+    thresholds = {}
+
+    for category in classifier.fast_models:
+        category_dir = Path(args.data_dir) / category
+        if not category_dir.is_dir():
+            print(f"⚠ {category} 평가 데이터 없음: {category_dir}")
+            continue
+
+        results = collect_predictions(classifier, category_dir)
+        if not results:
+            continue
+
+        full_acc = np.mean([np.argmax(full) == label for label, _, full in results])
+        fast_acc = np.mean([np.argmax(fast) == label for label, fast, _ in results])
+        current = classifier.cascade_thresholds.get(category, DEFAULT_CASCADE_THRESHOLD)
+
+        print(f"\n[{category}] 이미지 {len(results)}개 - 전체 모델 {full_acc * 100:.1f}%, "
+              f"경량 모델 {fast_acc * 100:.1f}%")
+        print(f"  {'임계값':>6} {'승격률':>7} {'정확도':>7} {'변화':>7}")
+
+        # 허용 하락 이내에서 승격률이 가장 낮은 임계값 선택
+        best = None
+        for threshold in CANDIDATE_THRESHOLDS:
+            escalation_rate, cascade_acc = evaluate_threshold(results, threshold)
+            drop = (full_acc - cascade_acc) * 100
+            marker = " *" if threshold == current else ""
+            print(f"  {threshold:>6.2f} {escalation_rate * 100:>6.1f}% "
+                  f"{cascade_acc * 100:>6.1f}% {-drop:>+6.1f}p{marker}")
+            if drop <= args.max_drop and (best is None or escalation_rate < best[1]):
+                best = (threshold, escalation_rate)
+
+        thresholds[category] = best[0] if best else 1.0
+        print(f"  → 선택 임계값: {thresholds[category]}")
+
+    if args.write and thresholds:
+        output_path = Path(args.model_dir) / "cascade_thresholds.json"
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(thresholds, f, indent=2)
+        print(f"\n✓ 임계값 저장: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,63 @@ import os
 from dotenv import load_dotenv
 import json
 import asyncio
+import time
+from types import SimpleNamespace
+
+from profiling import stage as profile_stage
+from recommendation_store import (
+    RecommendationStore,
+    combination_from_request,
+    combination_key,
+    log_combination,
+)
 
 load_dotenv()
 
 
+class FakeGenerativeModel:
+    """성능 테스트용 가짜 Gemini 모델 (외부 호출 없이 고정 지연 후 고정 응답)"""
+    
+    RESPONSE = {
+        "recommendations": {
+            "outer": {"item": "롱패딩", "color": "블랙", "pattern": "무지", "reason": "테스트 응답"},
+            "inner1": {"item": "니트/스웨터", "color": "그레이", "pattern": "무지", "reason": "테스트 응답"},
+            "inner2": {"item": "긴팔티", "color": "화이트", "pattern": "무지", "reason": "테스트 응답"},
+            "bottom": {"item": "청바지/데님", "color": "네이비", "pattern": "무지", "reason": "테스트 응답"},
+            "shoes": {"item": "스니커즈", "color": "화이트", "reason": "테스트 응답"}
+        },
+        "style_direction": "테스트 응답",
+        "styling_tips": ["테스트 팁1", "테스트 팁2", "테스트 팁3"]
+    }
+    
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.text = "```json\n" + json.dumps(self.RESPONSE, ensure_ascii=False) + "\n```"
+    
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return SimpleNamespace(text=self.text)
+
+
 class GeminiStyleAdvisor:
     """Gemini API를 사용한 스타일 어드바이저"""
     
     def __init__(self):
+        # 자주 나오는 조합은 미리 생성해 둔 추천 사용 (precompute_recommendations.py)
+        self.precomputed = RecommendationStore(
+            os.getenv("PRECOMPUTED_RECOMMENDATIONS_PATH", "precomputed/recommendations.db")
+        )
+        # 설정 시 조합 빈도 수집용 로그 기록
+        self.combination_log = os.getenv("COMBINATION_LOG_PATH")
+        
         # API 키 설정
         api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key or api_key == "your_api_key_here":
+        fake_latency_ms = os.getenv("GEMINI_FAKE_LATENCY_MS")
+        if fake_latency_ms is not None:
+            # 재생 테스트용: 실제 API 대신 가짜 모델 사용
+            self.model = FakeGenerativeModel(float(fake_latency_ms) / 1000)
+            print(f"⚠ 가짜 Gemini 모델 사용 (지연 {fake_latency_ms}ms)")
+        elif not api_key or api_key == "your_api_key_here":
             print("⚠ GEMINI_API_KEY가 설정되지 않았습니다. .env 파일을 확인하세요.")
             self.model = None
         else:
@@ -38,6 +84,22 @@ class GeminiStyleAdvisor:
                 ...
             }
         """
+        try:
+            combination = combination_from_request(user_info, uploaded_items)
+            key = combination_key(combination)
+            precomputed = self.precomputed.get(key)
+            if precomputed is not None:
+                print("✓ 사전 생성 추천 사용 (Gemini 호출 생략)")
+                return precomputed
+            if self.combination_log:
+                log_combination(self.combination_log, combination)
+        except Exception as e:
+            print(f"⚠ 사전 생성 추천 조회 실패: {e}")
+        
+        return await self.generate_recommendation(user_info, uploaded_items)
+    
+    async def generate_recommendation(self, user_info: dict, uploaded_items: dict):
+        """Gemini API를 직접 호출하여 추천 생성 (사전 생성 추천 조회 없음)"""
         try:
             if not self.model:
                 return {
@@ -53,11 +115,12 @@ class GeminiStyleAdvisor:
             
             # Gemini API 호출 (동기 방식을 비동기로 실행)
             loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, 
-                self.model.generate_content, 
-                prompt
-            )
+            with profile_stage("gemini"):
+                response = await loop.run_in_executor(
+                    None, 
+                    self.model.generate_content, 
+                    prompt
+                )
             
             # 응답 파싱
             recommendation = self._parse_response(response.text, uploaded_items)
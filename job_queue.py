@@ -0,0 +1,272 @@
+import asyncio
+import json
+import math
+import os
+import socket
+import sqlite3
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+# 워커가 죽어 재시작될 때 같은 작업을 다시 시도하는 최대 횟수
+MAX_ATTEMPTS = 3
+
+# 실행 중인 작업의 임대 시간 (워커가 주기적으로 연장, 만료되면 다른 프로세스가 다시 가져감)
+LEASE_SECONDS = 60
+
+
+class JobQueue:
+    """SQLite 기반 영속 작업 큐 + asyncio 워커 풀
+
+    작업과 결과는 DB 파일에 저장되므로 서버가 재시작되어도 유지됨.
+    실행 중인 작업은 프로세스별 임대(lease)를 가지며, 임대가 만료된 작업만
+    (프로세스가 죽은 경우) 다시 대기열로 돌아가므로 여러 프로세스가 DB를 공유해도 됨.
+    작업이 완료/실패 상태가 되면 on_finish(job_id)가 호출됨 (업로드 파일 정리 등).
+    """
+
+    def __init__(self, db_path="jobs/jobs.db", workers=2):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.handler: Optional[Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = None
+        self.on_finish: Optional[Callable[[str], None]] = None
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._events: Dict[str, asyncio.Event] = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """작업 단위 연결 (정상 종료 시 commit, 예외 시 rollback)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    idempotency_key TEXT UNIQUE,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            # 임대 컬럼이 없던 기존 DB 마이그레이션
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            if "lease_until" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+
+    def new_job_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def submit(self, job_id: str, payload: Dict[str, Any],
+               idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """작업 등록 (같은 멱등 키로 이미 등록된 작업이 있으면 그 작업 반환)"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, idempotency_key, status, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, idempotency_key, QUEUED, json.dumps(payload, ensure_ascii=False), now, now)
+            )
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        if idempotency_key:
+            return self.find_by_key(idempotency_key)
+        return self.get(job_id)
+
+    def find_by_key(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,)).fetchone()
+        return self._to_dict(row)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """작업이 끝나거나 timeout이 지날 때까지 대기 (long-poll)"""
+        if not math.isfinite(timeout) or timeout < 0:
+            timeout = 0
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED_STATES or remaining <= 0:
+                return job
+
+            event = self._events.setdefault(job_id, asyncio.Event())
+            try:
+                # 다른 프로세스의 워커가 처리하는 경우를 위해 주기적으로 DB도 확인
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, 1.0))
+            except asyncio.TimeoutError:
+                pass
+
+    def _to_dict(self, row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    # ----- 워커 -----
+
+    async def start(self, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                    on_finish: Optional[Callable[[str], None]] = None):
+        """워커 풀 시작"""
+        self.handler = handler
+        self.on_finish = on_finish
+        self._wakeup = asyncio.Event()
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(i)))
+        print(f"✓ 작업 큐 워커 {self.workers}개 시작 ({self.db_path})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        # 정상 종료 시 실행 중이던 작업은 임대 만료를 기다리지 않고 바로 반납
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL, attempts = attempts - 1, "
+                "updated_at = ? WHERE owner = ? AND status = ?",
+                (QUEUED, time.time(), self.owner, RUNNING)
+            )
+
+    def _notify_finished(self, job_id: str):
+        if self.on_finish is None:
+            return
+        try:
+            self.on_finish(job_id)
+        except Exception as e:
+            print(f"⚠ 작업 종료 처리 실패: {job_id} - {e}")
+
+    def _recover_expired(self, conn, now: float):
+        """임대가 만료된 작업(소유 프로세스가 죽은 작업)을 다시 대기열로
+        
+        재시도 횟수를 넘긴 작업은 실패 처리하고 그 job_id 목록 반환
+        """
+        expired = "status = ? AND (lease_until IS NULL OR lease_until < ?)"
+        failed = [
+            row["id"] for row in conn.execute(
+                f"SELECT id FROM jobs WHERE {expired} AND attempts >= ?", (RUNNING, now, MAX_ATTEMPTS)
+            )
+        ]
+        conn.executemany(
+            "UPDATE jobs SET status = ?, error = ?, owner = NULL, updated_at = ? WHERE id = ?",
+            [(FAILED, "작업 재시도 횟수 초과", now, job_id) for job_id in failed]
+        )
+        recovered = conn.execute(
+            f"UPDATE jobs SET status = ?, owner = NULL, updated_at = ? WHERE {expired}",
+            (QUEUED, now, RUNNING, now)
+        ).rowcount
+        if recovered:
+            print(f"✓ 임대 만료된 작업 {recovered}개 재등록")
+        return failed
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """대기 중인 가장 오래된 작업 하나를 원자적으로 가져옴 (임대 설정)"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            failed = self._recover_expired(conn, now)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, owner = ?, lease_until = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (RUNNING, self.owner, now + LEASE_SECONDS, now, row["id"])
+                )
+        # 커밋 이후에 정리 (롤백되면 아직 실행 중인 작업일 수 있음)
+        for job_id in failed:
+            self._notify_finished(job_id)
+        return row
+
+    async def _renew_lease(self, job_id: str):
+        """작업 실행 중 임대를 주기적으로 연장"""
+        while True:
+            await asyncio.sleep(LEASE_SECONDS / 3)
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = ?",
+                    (time.time() + LEASE_SECONDS, job_id, self.owner, RUNNING)
+                )
+
+    def _finish(self, job_id: str, status: str, result=None, error=None):
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND owner = ? AND status = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), job_id, self.owner, RUNNING)
+            ).rowcount
+        # 임대를 잃어 다른 프로세스가 다시 실행 중이면 파일을 건드리지 않음
+        if updated:
+            self._notify_finished(job_id)
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _worker(self, worker_id: int):
+        while True:
+            # claim 전에 clear해야 그 사이 등록된 작업 알림을 놓치지 않음
+            self._wakeup.clear()
+            row = self._claim()
+            if row is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id = row["id"]
+            print(f"⚙ 작업 시작 (워커 {worker_id}): {job_id}")
+            renew = asyncio.create_task(self._renew_lease(job_id))
+            try:
+                result = await self.handler(json.loads(row["payload"]))
+                self._finish(job_id, DONE, result=result)
+                print(f"✓ 작업 완료: {job_id}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                traceback.print_exc()
+                self._finish(job_id, FAILED, error=str(e))
+                print(f"❌ 작업 실패: {job_id} - {e}")
+            finally:
+                renew.cancel()
@@ -3,8 +3,20 @@ from tensorflow import keras
 import numpy as np
 from PIL import Image
 import os
+import json
+import threading
 from pathlib import Path
 
+from profiling import stage as profile_stage
+
+# 모델 입력 크기 (학습 시와 동일)
+INPUT_SIZE = (224, 224)
+
+# 캐스케이드 1단계(경량) 모델 설정
+FAST_INPUT_SIZE = (128, 128)
+FAST_ALPHA = 0.35
+DEFAULT_CASCADE_THRESHOLD = 0.9
+
 
 class ClothingClassifier:
     """ML 모델을 사용한 의류 분류기"""
@@ -12,6 +24,15 @@ class ClothingClassifier:
     def __init__(self, model_dir="models"):
         self.model_dir = Path(model_dir)
         self.models = {}
+        # 스레드별로 재사용하는 uint8 입력 버퍼 (1, 224, 224, 3)
+        self._buffers = threading.local()
+        
+        # 캐스케이드 모드: 경량 모델 신뢰도가 임계값 이상이면 바로 응답, 아니면 전체 모델로 승격
+        self.cascade_enabled = os.getenv("CLASSIFIER_CASCADE", "0") == "1"
+        self.fast_models = {}
+        self.cascade_thresholds = self.load_cascade_thresholds()
+        self.cascade_stats = {}
+        self._stats_lock = threading.Lock()
         self.load_models()
         
         # 카테고리별 클래스 레이블 (폴더명 알파벳순으로 정렬된 순서와 매칭)
@@ -60,6 +81,17 @@ class ClothingClassifier:
                 "스트라이프"        # stripe
             ]
         }
+        
+        # 학습 데이터셋 폴더명 (self.labels와 같은 순서)
+        self.class_folders = {
+            "outer": ["blouson_ma1", "coat", "fleece", "leather_jacket", "light_padding",
+                      "long_padding", "mustang", "padding_vest", "short_padding"],
+            "inner1": ["cardigan", "hoodie", "knit", "sweatshirt"],
+            "inner2": ["long_sleeve", "shirt", "short_sleeve", "turtleneck"],
+            "bottom": ["cargo", "corduroy", "cotton_chino", "jeans", "long_skirt",
+                       "midi_skirt", "mini_skirt", "slacks", "training_jogger"],
+            "pattern": ["camo", "check", "graphic", "logo", "plain", "stripe"]
+        }
     
     def create_model_architecture(self, num_classes):
         """모델 구조 생성 (학습 시와 동일한 구조)"""
@@ -82,6 +114,38 @@ class ClothingClassifier:
         
         return model
     
+    def create_fast_model_architecture(self, num_classes):
+        """캐스케이드 1단계 경량 모델 구조 (저해상도 + 축소 폭 MobileNetV2)"""
+        base_model = keras.applications.MobileNetV2(
+            input_shape=(*FAST_INPUT_SIZE, 3),
+            alpha=FAST_ALPHA,
+            include_top=False,
+            weights='imagenet'
+        )
+        base_model.trainable = False
+        
+        model = keras.Sequential([
+            keras.layers.Input(shape=(*FAST_INPUT_SIZE, 3)),
+            base_model,
+            keras.layers.GlobalAveragePooling2D(),
+            keras.layers.Dropout(0.3),
+            keras.layers.Dense(num_classes, activation='softmax')
+        ])
+        
+        return model
+    
+    def wrap_uint8_input(self, model, input_size=INPUT_SIZE):
+        """uint8 이미지를 직접 받도록 리사이즈/정규화 레이어를 그래프 앞에 추가
+        
+        학습된 모델 구조와 가중치는 그대로 두고 감싸기만 하므로 가중치 파일 호환성 유지.
+        입력 크기가 input_size와 달라도 그래프 안에서 리사이즈됨.
+        """
+        inputs = keras.layers.Input(shape=(None, None, 3), dtype="uint8")
+        x = keras.layers.Resizing(*input_size, interpolation="bilinear")(inputs)
+        x = keras.layers.Rescaling(1.0 / 255)(x)
+        outputs = model(x)
+        return keras.Model(inputs, outputs)
+    
     def load_models(self):
         """저장된 모델 로드"""
         import tempfile
@@ -116,8 +180,11 @@ class ClothingClassifier:
                         
                         # 가중치 로드
                         model.load_weights(str(weights_path))
-                        self.models[category] = model
+                        self.models[category] = self.wrap_uint8_input(model)
                         print(f"✓ {category} 모델 로드 완료: {filename}")
+                        
+                        if self.cascade_enabled:
+                            self.load_fast_model(category, num_classes)
                     else:
                         print(f"⚠ {category} 가중치 파일 없음: {filename} (Gemini로 대체)")
                         self.models[category] = None
@@ -128,14 +195,98 @@ class ClothingClassifier:
         except Exception as e:
             print(f"모델 로드 중 전체 오류: {e}")
     
-    def preprocess_image(self, image_path, target_size=(224, 224)):
-        """이미지 전처리"""
+    def load_fast_model(self, category, num_classes):
+        """캐스케이드 1단계 경량 모델 로드 (가중치 없으면 해당 카테고리는 전체 모델만 사용)"""
+        filename = f"{category}_fast.weights.h5"
+        weights_path = self.model_dir / filename
+        if not weights_path.exists():
+            print(f"⚠ {category} 경량 가중치 파일 없음: {filename} (전체 모델만 사용)")
+            return
+        
+        try:
+            model = self.create_fast_model_architecture(num_classes)
+            model.load_weights(str(weights_path))
+            self.fast_models[category] = self.wrap_uint8_input(model, FAST_INPUT_SIZE)
+            print(f"✓ {category} 경량 모델 로드 완료: {filename} "
+                  f"(임계값 {self.cascade_thresholds.get(category, DEFAULT_CASCADE_THRESHOLD)})")
+        except Exception as e:
+            print(f"⚠ {category} 경량 모델 로드 실패: {e}")
+    
+    def load_cascade_thresholds(self):
+        """카테고리별 캐스케이드 임계값 로드 (evaluate_cascade.py가 생성)"""
+        thresholds_path = self.model_dir / "cascade_thresholds.json"
+        if not thresholds_path.exists():
+            return {}
+        try:
+            with open(thresholds_path, encoding="utf-8") as f:
+                return {category: float(value) for category, value in json.load(f).items()}
+        except Exception as e:
+            print(f"⚠ 캐스케이드 임계값 로드 실패: {e}")
+            return {}
+    
+    def predict(self, category, img_array):
+        """카테고리 모델 예측 (캐스케이드 모드면 경량 모델 먼저 시도)
+        
+        Returns:
+            (확률 배열, 사용된 단계 "fast" | "full")
+        """
+        fast_model = self.fast_models.get(category) if self.cascade_enabled else None
+        if fast_model is not None:
+            with profile_stage("predict_fast"):
+                predictions = fast_model.predict(img_array, verbose=0)[0]
+            threshold = self.cascade_thresholds.get(category, DEFAULT_CASCADE_THRESHOLD)
+            if float(np.max(predictions)) >= threshold:
+                self._record_stage(category, "fast")
+                return predictions, "fast"
+        
+        with profile_stage("predict"):
+            predictions = self.models[category].predict(img_array, verbose=0)[0]
+        if fast_model is not None:
+            self._record_stage(category, "full")
+        return predictions, "full"
+    
+    def _record_stage(self, category, stage):
+        """카테고리별 1단계 응답 / 승격 횟수 기록"""
+        with self._stats_lock:
+            stats = self.cascade_stats.setdefault(category, {"fast": 0, "full": 0})
+            stats[stage] += 1
+    
+    def cascade_summary(self):
+        """카테고리별 캐스케이드 승격률 요약"""
+        with self._stats_lock:
+            summary = {}
+            for category, stats in self.cascade_stats.items():
+                total = stats["fast"] + stats["full"]
+                summary[category] = {
+                    "requests": total,
+                    "escalated": stats["full"],
+                    "escalation_rate": round(stats["full"] / total, 4) if total else 0.0,
+                    "threshold": self.cascade_thresholds.get(category, DEFAULT_CASCADE_THRESHOLD)
+                }
+            return {"enabled": self.cascade_enabled, "categories": summary}
+    
+    def _input_buffer(self):
+        """현재 스레드의 재사용 입력 버퍼"""
+        buffer = getattr(self._buffers, "array", None)
+        if buffer is None:
+            buffer = np.empty((1, *INPUT_SIZE, 3), dtype=np.uint8)
+            self._buffers.array = buffer
+        return buffer
+    
+    def preprocess_image(self, image_path, target_size=INPUT_SIZE, out=None):
+        """이미지 전처리
+        
+        정규화는 모델 그래프 안에서 수행하므로 uint8 배열 (1, H, W, 3)을 반환.
+        out에 미리 할당한 uint8 배치 배열을 넘기면 float 임시 배열 없이 그대로 채움.
+        """
         try:
-            img = Image.open(image_path).convert('RGB')
-            img = img.resize(target_size)
-            img_array = np.array(img) / 255.0  # 정규화
-            img_array = np.expand_dims(img_array, axis=0)
-            return img_array
+            with profile_stage("pil_decode"):
+                img = Image.open(image_path).convert('RGB')
+                img = img.resize(target_size)
+                if out is None:
+                    out = np.empty((1, target_size[1], target_size[0], 3), dtype=np.uint8)
+                out[0] = np.asarray(img, dtype=np.uint8)
+            return out
         except Exception as e:
             print(f"이미지 전처리 오류: {e}")
             return None
@@ -151,15 +302,14 @@ class ClothingClassifier:
         
         try:
             # 이미지 전처리
-            img_array = self.preprocess_image(image_path)
+            img_array = self.preprocess_image(image_path, out=self._input_buffer())
             if img_array is None:
                 return "이미지 처리 실패"
             
             # 예측
-            model = self.models[category]
-            predictions = model.predict(img_array, verbose=0)
-            predicted_class = np.argmax(predictions[0])
-            confidence = float(predictions[0][predicted_class])
+            predictions, stage = self.predict(category, img_array)
+            predicted_class = np.argmax(predictions)
+            confidence = float(predictions[predicted_class])
             
             # 레이블 가져오기
             if category in self.labels and predicted_class < len(self.labels[category]):
@@ -169,7 +319,8 @@ class ClothingClassifier:
             
             return {
                 "label": label,
-                "confidence": round(confidence * 100, 2)
+                "confidence": round(confidence * 100, 2),
+                "stage": stage
             }
         
         except Exception as e:
@@ -186,15 +337,14 @@ class ClothingClassifier:
         
         try:
             # 이미지 전처리
-            img_array = self.preprocess_image(image_path)
+            img_array = self.preprocess_image(image_path, out=self._input_buffer())
             if img_array is None:
                 return "이미지 처리 실패"
             
             # 예측
-            model = self.models["pattern"]
-            predictions = model.predict(img_array, verbose=0)
-            predicted_class = np.argmax(predictions[0])
-            confidence = float(predictions[0][predicted_class])
+            predictions, stage = self.predict("pattern", img_array)
+            predicted_class = np.argmax(predictions)
+            confidence = float(predictions[predicted_class])
             
             # 레이블 가져오기
             if predicted_class < len(self.labels["pattern"]):
@@ -204,7 +354,8 @@ class ClothingClassifier:
             
             return {
                 "label": label,
-                "confidence": round(confidence * 100, 2)
+                "confidence": round(confidence * 100, 2),
+                "stage": stage
             }
         
         except Exception as e:
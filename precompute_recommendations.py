@@ -0,0 +1,127 @@
+"""
+자주 나오는 코디 조합의 Gemini 추천을 미리 생성
+
+조합 로그(COMBINATION_LOG_PATH)와 작업 큐 DB에서 빈도가 높은 조합을 찾아
+정해진 속도로 Gemini를 호출하고 결과를 추천 저장소에 기록.
+이미 저장된 조합은 건너뛰므로 중단 후 다시 실행해도 이어서 진행됨.
+
+사용법: python precompute_recommendations.py --log combinations.jsonl --top 3000 --rate 10
+"""
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+
+from gemini_service import GeminiStyleAdvisor
+from recommendation_store import (
+    RecommendationStore,
+    combination_from_request,
+    combination_key,
+    uploaded_items_from_combination,
+)
+
+
+def count_from_log(counter, log_path):
+    """조합 로그(JSONL, 한 줄에 조합 하나) 집계"""
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                counter[combination_key(json.loads(line))] += 1
+
+
+def count_from_jobs(counter, db_path):
+    """작업 큐 DB의 완료된 분석 결과 집계"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT result FROM jobs WHERE status = 'done' AND result IS NOT NULL")
+        for (result,) in rows:
+            result = json.loads(result)
+            combination = combination_from_request(result["user_info"], result["uploaded_items"])
+            counter[combination_key(combination)] += 1
+    finally:
+        conn.close()
+
+
+def is_cacheable(recommendation):
+    """오류나 파싱 실패 응답은 저장하지 않음"""
+    return (
+        isinstance(recommendation, dict)
+        and recommendation.get("recommendations")
+        and not any(k in recommendation for k in ("error", "parse_error", "raw_response"))
+    )
+
+
+async def precompute(advisor, store, keys, rate):
+    """분당 rate회 이하로 Gemini를 호출하며 추천 생성"""
+    interval = 60.0 / rate
+    saved = failed = 0
+
+    for i, key in enumerate(keys, 1):
+        started = time.monotonic()
+        combination = json.loads(key)
+        recommendation = await advisor.generate_recommendation(
+            combination["user_info"],
+            uploaded_items_from_combination(combination)
+        )
+
+        if is_cacheable(recommendation):
+            store.put(key, recommendation)
+            saved += 1
+        else:
+            failed += 1
+            if recommendation.get("error") == "quota_exceeded":
+                print("⚠ Gemini 할당량 초과로 중단 (다시 실행하면 이어서 진행)")
+                break
+        print(f"  [{i}/{len(keys)}] 저장 {saved}, 실패 {failed}")
+
+        elapsed = time.monotonic() - started
+        if i < len(keys) and elapsed < interval:
+            await asyncio.sleep(interval - elapsed)
+
+    return saved, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="자주 나오는 조합의 추천 사전 생성")
+    parser.add_argument("--log", nargs="*", default=[], help="조합 로그 파일 (JSONL)")
+    parser.add_argument("--jobs-db", help="작업 큐 DB 경로 (예: jobs/jobs.db)")
+    parser.add_argument("--top", type=int, default=3000, help="생성할 상위 조합 수")
+    parser.add_argument("--min-count", type=int, default=2, help="최소 등장 횟수")
+    parser.add_argument("--rate", type=float, default=10, help="분당 최대 Gemini 호출 수")
+    parser.add_argument("--output", default="precomputed/recommendations.db")
+    parser.add_argument("--dry-run", action="store_true", help="집계 결과만 출력")
+    args = parser.parse_args()
+
+    counter = Counter()
+    for log_path in args.log:
+        count_from_log(counter, log_path)
+    if args.jobs_db and Path(args.jobs_db).exists():
+        count_from_jobs(counter, args.jobs_db)
+
+    total = sum(counter.values())
+    top = [(key, count) for key, count in counter.most_common(args.top) if count >= args.min_count]
+    covered = sum(count for _, count in top)
+    print(f"요청 {total}건, 조합 {len(counter)}개 → 상위 {len(top)}개가 "
+          f"{covered / total * 100 if total else 0:.1f}% 차지")
+
+    store = RecommendationStore(args.output)
+    pending = [key for key, _ in top if key not in store]
+    print(f"이미 저장됨 {len(top) - len(pending)}개, 생성 대상 {len(pending)}개")
+    if args.dry_run or not pending:
+        return
+
+    advisor = GeminiStyleAdvisor()
+    if not advisor.model:
+        print("⚠ GEMINI_API_KEY가 없어 생성할 수 없습니다.")
+        return
+
+    saved, failed = asyncio.run(precompute(advisor, store, pending, args.rate))
+    print(f"✓ 완료: 저장 {saved}개, 실패 {failed}개 (총 {len(store)}개)")
+
+
+if __name__ == "__main__":
+    main()
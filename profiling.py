@@ -0,0 +1,211 @@
+import contextvars
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+from fastapi.requests import Request
+
+
+# 현재 요청의 프로파일 (프로파일링 대상이 아니면 None)
+_current_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+_NULL_STAGE = nullcontext()
+
+# 대기 중인 스레드의 스택 (샘플에서 제외)
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+}
+
+
+def stage(name: str):
+    """파이프라인 단계 측정 (프로파일링 대상 요청이 아니면 아무 일도 하지 않음)
+
+    사용: with stage("kmeans"): ...
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return _NULL_STAGE
+    return profile.stage(name)
+
+
+class StackSampler(threading.Thread):
+    """주기적으로 모든 스레드의 스택을 수집하는 통계적 프로파일러"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((os.path.basename(code.co_filename), code.co_name, code.co_firstlineno))
+                    frame = frame.f_back
+                if not stack or stack[0][:2] in IDLE_LEAVES:
+                    continue
+                frames = [f"{func} ({filename}:{line})" for filename, func, line in reversed(stack)]
+                self.stacks[";".join([names.get(ident, str(ident))] + frames)] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfile:
+    """요청 하나의 프로파일 (스택 샘플 + 단계별 시간/메모리)"""
+
+    def __init__(self, path: str, interval: float, trace_memory: bool):
+        self.id = uuid.uuid4().hex[:12]
+        self.path = path
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.status_code = None
+        self.stages: List[Dict[str, Any]] = []
+        self.trace_memory = trace_memory
+        self._sampler = StackSampler(interval)
+        self._started_tracemalloc = False
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        self._sampler.start()
+        self._t0 = time.perf_counter()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self._t0
+        self._sampler.stop()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str):
+        record = {"stage": name, "offset": round(time.perf_counter() - self._t0, 6)}
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            before = tracemalloc.take_snapshot()
+            start_current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            record["seconds"] = round(time.perf_counter() - t0, 6)
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                record["memory"] = {
+                    "allocated": current - start_current,
+                    "peak": peak - start_current,
+                    "top": [
+                        {"location": str(stat.traceback[0]), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                        for stat in after.compare_to(before, "lineno")[:10]
+                    ],
+                }
+            self.stages.append(record)
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope에서 바로 읽을 수 있는 collapsed stack 형식"""
+        return "\n".join(f"{stack} {count}" for stack, count in self._sampler.stacks.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration": round(self.duration, 6),
+            "status_code": self.status_code,
+            "samples": self._sampler.samples,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), "stages": self.stages}
+
+
+class RequestProfiler:
+    """선택한 요청만 프로파일링하는 HTTP 미들웨어 + 최근 프로파일 보관
+
+    - PROFILE_TOKEN: 프로파일링을 켜는 필수 설정. X-Profile-Token 헤더가 일치하는
+      요청을 프로파일링하고, 관리자 조회 엔드포인트 인증에도 사용
+    - PROFILE_SAMPLE_RATE: 대상 경로 요청 중 무작위로 프로파일링할 비율 (0~1)
+      (토큰 없이는 결과를 조회할 수 없으므로 PROFILE_TOKEN이 없으면 무시)
+    PROFILE_TOKEN이 없으면 미들웨어를 등록하지 않으므로 오버헤드 없음.
+    """
+
+    def __init__(self, paths=("/api/analyze", "/api/re-recommend")):
+        self.paths = set(paths)
+        self.sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.token = os.getenv("PROFILE_TOKEN") or None
+        self.interval = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+        self.trace_memory = os.getenv("PROFILE_TRACEMALLOC", "1") == "1"
+        self.profiles = deque(maxlen=int(os.getenv("PROFILE_HISTORY", "20")))
+        if self.sample_rate > 0 and self.token is None:
+            print("⚠ PROFILE_TOKEN 없이 PROFILE_SAMPLE_RATE만 설정됨 (프로파일링 비활성)")
+            self.sample_rate = 0.0
+        # 동시에 하나의 요청만 프로파일링 (샘플러/tracemalloc은 프로세스 전역)
+        self._active = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.token is not None
+
+    def authorized(self, request: Request) -> bool:
+        if self.token is None:
+            return False
+        supplied = request.headers.get("x-profile-token", "")
+        return hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8"))
+
+    def _should_profile(self, request: Request) -> bool:
+        if request.url.path not in self.paths:
+            return False
+        if self.authorized(request):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def middleware(self, request: Request, call_next):
+        if not self._should_profile(request) or not self._active.acquire(blocking=False):
+            return await call_next(request)
+
+        profile = RequestProfile(request.url.path, self.interval, self.trace_memory)
+        token = _current_profile.set(profile)
+        profile.start()
+        try:
+            response = await call_next(request)
+            profile.status_code = response.status_code
+        finally:
+            profile.stop()
+            _current_profile.reset(token)
+            self._active.release()
+            self.profiles.append(profile)
+            print(f"🔎 프로파일 저장: {profile.id} {profile.path} ({profile.duration * 1000:.0f}ms)")
+
+        response.headers["X-Profile-Id"] = profile.id
+        return response
+
+    def find(self, profile_id: str) -> Optional[RequestProfile]:
+        for profile in self.profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
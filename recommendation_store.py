@@ -0,0 +1,120 @@
+import json
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+CATEGORIES = ["outer", "inner1", "inner2", "bottom"]
+USER_FIELDS = ["gender", "age_group", "body_type", "tpo"]
+
+
+def _label(value) -> str:
+    """type/pattern 값에서 레이블 추출 (dict 또는 문자열)"""
+    if isinstance(value, dict):
+        return str(value.get("label", "정보 없음"))
+    return str(value) if value else "정보 없음"
+
+
+def combination_from_request(user_info: Dict[str, Any], uploaded_items: Dict[str, Any]) -> Dict[str, Any]:
+    """프롬프트에 들어가는 값만 남긴 조합 (이미지 경로, 신뢰도 등 제외)"""
+    items = {}
+    for category in CATEGORIES:
+        if category not in uploaded_items:
+            continue
+        item = uploaded_items[category]
+        colors = item.get("colors")
+        items[category] = {
+            "type": _label(item.get("type")),
+            "pattern": _label(item.get("pattern")),
+            "colors": [c["name"] if isinstance(c, dict) else str(c) for c in colors]
+            if isinstance(colors, list) else []
+        }
+    return {
+        "user_info": {field: str(user_info.get(field, "")).strip() for field in USER_FIELDS},
+        "items": items
+    }
+
+
+def combination_key(combination: Dict[str, Any]) -> str:
+    """조합의 고정 문자열 키"""
+    return json.dumps(combination, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def uploaded_items_from_combination(combination: Dict[str, Any]) -> Dict[str, Any]:
+    """조합을 GeminiStyleAdvisor가 받는 uploaded_items 형식으로 복원"""
+    return {
+        category: {
+            "type": {"label": item["type"]},
+            "pattern": {"label": item["pattern"]},
+            "colors": [{"name": name} for name in item["colors"]]
+        }
+        for category, item in combination["items"].items()
+    }
+
+
+def log_combination(log_path: str, combination: Dict[str, Any]):
+    """조합 빈도 수집용 JSONL 로그에 한 줄 추가"""
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(combination_key(combination) + "\n")
+
+
+class RecommendationStore:
+    """미리 생성해 둔 추천 결과 (SQLite 파일, 키 인덱스 + zlib 압축 JSON)
+
+    시작 시 압축된 상태 그대로 메모리에 올려두고, 조회 시에만 풀어서 반환.
+    """
+
+    def __init__(self, db_path="precomputed/recommendations.db"):
+        self.db_path = Path(db_path)
+        self.entries: Dict[str, bytes] = {}
+        self.load()
+
+    def _connect(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS recommendations ("
+            "key TEXT PRIMARY KEY, recommendation BLOB NOT NULL) WITHOUT ROWID"
+        )
+        return conn
+
+    def load(self):
+        """저장된 추천 결과를 메모리로 로드"""
+        if not self.db_path.exists():
+            return
+        try:
+            conn = self._connect()
+            try:
+                self.entries = dict(conn.execute("SELECT key, recommendation FROM recommendations"))
+            finally:
+                conn.close()
+            print(f"✓ 사전 생성 추천 {len(self.entries)}개 로드 ({self.db_path})")
+        except Exception as e:
+            print(f"⚠ 사전 생성 추천 로드 실패: {e}")
+            self.entries = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.entries.get(key)
+        if data is None:
+            return None
+        return json.loads(zlib.decompress(data))
+
+    def put(self, key: str, recommendation: Dict[str, Any]):
+        data = zlib.compress(json.dumps(recommendation, ensure_ascii=False).encode("utf-8"), 9)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO recommendations (key, recommendation) VALUES (?, ?)",
+                    (key, data)
+                )
+        finally:
+            conn.close()
+        self.entries[key] = data
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
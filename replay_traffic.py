@@ -0,0 +1,249 @@
+"""
+기록된 요청 재생 - 성능 회귀 테스트
+
+CAPTURE_DIR로 기록한 요청을 원래 간격(또는 배속)으로 대상 서버에 보내고
+지연 시간 분포, 오류율, 서버 메모리(RSS)를 측정. 두 빌드의 결과 비교 가능.
+
+대상 서버는 가짜 Gemini로 실행 (외부 API 호출 없이 고정 지연):
+    GEMINI_FAKE_LATENCY_MS=800 uvicorn app:app --port 8000
+
+사용법:
+    python replay_traffic.py run captures --target http://localhost:8000 --speed 2 --pid <서버 PID> --output new.json
+    python replay_traffic.py compare old.json new.json
+"""
+import argparse
+import json
+import mimetypes
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def load_entries(capture_dir, limit=None):
+    """기록된 요청을 시간순으로 로드"""
+    with open(Path(capture_dir) / "requests.jsonl", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries[:limit] if limit else entries
+
+
+def encode_multipart(fields, files):
+    """multipart/form-data 본문 생성 (files: [(필드명, 파일명, 바이트)])"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    for name, filename, data in files:
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode("utf-8") + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def build_request(entry, capture_dir, target):
+    """기록 한 줄을 HTTP 요청으로 변환"""
+    url = target.rstrip("/") + entry["endpoint"]
+    if entry["endpoint"] == "/api/analyze":
+        files = []
+        for category, image in entry["images"].items():
+            image_path = Path(capture_dir) / "images" / f"{image['sha256']}{image['ext']}"
+            files.append((category, f"{category}{image['ext']}", image_path.read_bytes()))
+        body, content_type = encode_multipart(entry["form"], files)
+    else:
+        body = json.dumps(entry["json"], ensure_ascii=False).encode("utf-8")
+        content_type = "application/json"
+    return urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": content_type})
+
+
+class RssSampler(threading.Thread):
+    """대상 서버 프로세스의 RSS 주기적 측정 (Linux /proc)"""
+
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.status_path = Path(f"/proc/{pid}/status")
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                for line in self.status_path.read_text().splitlines():
+                    if line.startswith("VmRSS:"):
+                        self.samples.append(int(line.split()[1]) / 1024)  # MB
+                        break
+            except OSError:
+                break
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(latencies, errors):
+    count = len(latencies) + errors
+    return {
+        "count": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "mean": round(sum(latencies) / len(latencies), 4) if latencies else None,
+        **{f"p{q}": percentile(latencies, q) for q in (50, 90, 99)},
+        "max": max(latencies) if latencies else None,
+    }
+
+
+def run(args):
+    entries = load_entries(args.capture_dir, args.limit)
+    if not entries:
+        print("재생할 요청이 없습니다.")
+        return
+
+    results = []
+    results_lock = threading.Lock()
+
+    def send(entry, scheduled_at):
+        request = build_request(entry, args.capture_dir, args.target)
+        status = None
+        try:
+            with urllib.request.urlopen(request, timeout=args.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception as e:
+            status = f"{type(e).__name__}"
+        # 예정 시각 기준으로 측정 (서버가 밀려 늦게 보낸 시간도 지연에 포함)
+        latency = time.perf_counter() - scheduled_at
+        with results_lock:
+            results.append({"endpoint": entry["endpoint"], "status": status, "latency": round(latency, 4)})
+
+    sampler = RssSampler(args.pid) if args.pid else None
+    if sampler:
+        sampler.start()
+
+    print(f"요청 {len(entries)}개 재생 ({args.speed}배속) → {args.target}")
+    ts0 = entries[0]["ts"]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for entry in entries:
+            scheduled_at = started + (entry["ts"] - ts0) / args.speed
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, entry, scheduled_at)
+    elapsed = time.perf_counter() - started
+
+    if sampler:
+        sampler.stop()
+
+    report = {
+        "label": args.label or args.target,
+        "speed": args.speed,
+        "duration": round(elapsed, 3),
+        "endpoints": {},
+        "memory": None,
+    }
+    for endpoint in sorted({r["endpoint"] for r in results}):
+        rows = [r for r in results if r["endpoint"] == endpoint]
+        ok = [r["latency"] for r in rows if r["status"] == 200]
+        report["endpoints"][endpoint] = summarize(ok, len(rows) - len(ok))
+    report["endpoints"]["all"] = summarize(
+        [r["latency"] for r in results if r["status"] == 200],
+        sum(1 for r in results if r["status"] != 200)
+    )
+    if sampler and sampler.samples:
+        report["memory"] = {
+            "peak_rss_mb": round(max(sampler.samples), 1),
+            "mean_rss_mb": round(sum(sampler.samples) / len(sampler.samples), 1),
+        }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({**report, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"✓ 결과 저장: {args.output}")
+
+
+def print_report(report):
+    print(f"\n[{report['label']}] {report['duration']}s")
+    print(f"  {'endpoint':<20} {'count':>6} {'err%':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for endpoint, stats in report["endpoints"].items():
+        cols = [f"{stats[k]:.3f}" if stats[k] is not None else "-" for k in ("p50", "p90", "p99", "max")]
+        print(f"  {endpoint:<20} {stats['count']:>6} {stats['error_rate'] * 100:>5.1f}% "
+              + " ".join(f"{c:>8}" for c in cols))
+    if report.get("memory"):
+        print(f"  RSS 최대 {report['memory']['peak_rss_mb']}MB, 평균 {report['memory']['mean_rss_mb']}MB")
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        cand = json.load(f)
+
+    def change(old, new):
+        if old is None or new is None:
+            return "-"
+        if old == 0:
+            return f"{new:.3f}"
+        return f"{old:.3f} → {new:.3f} ({(new - old) / old * 100:+.1f}%)"
+
+    print(f"기준: {base['label']} / 비교: {cand['label']}")
+    for endpoint, new in cand["endpoints"].items():
+        old = base["endpoints"].get(endpoint)
+        if old is None:
+            continue
+        print(f"\n  {endpoint}")
+        for key in ("p50", "p90", "p99", "max", "error_rate"):
+            print(f"    {key:<10} {change(old[key], new[key])}")
+    if base.get("memory") and cand.get("memory"):
+        print("\n  memory")
+        for key in ("peak_rss_mb", "mean_rss_mb"):
+            print(f"    {key:<12} {change(base['memory'][key], cand['memory'][key])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기록된 요청 재생 및 빌드 간 성능 비교")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="요청 재생")
+    run_parser.add_argument("capture_dir", help="CAPTURE_DIR로 기록한 폴더")
+    run_parser.add_argument("--target", default="http://localhost:8000")
+    run_parser.add_argument("--speed", type=float, default=1.0, help="재생 배속 (2 = 원래 속도의 2배)")
+    run_parser.add_argument("--concurrency", type=int, default=32, help="최대 동시 요청 수")
+    run_parser.add_argument("--timeout", type=float, default=120)
+    run_parser.add_argument("--limit", type=int, help="재생할 최대 요청 수")
+    run_parser.add_argument("--pid", type=int, help="메모리를 측정할 서버 프로세스 PID")
+    run_parser.add_argument("--label", help="결과 이름 (예: 빌드 커밋)")
+    run_parser.add_argument("--output", help="결과 JSON 저장 경로")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="두 결과 비교")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import gzip
+import hashlib
+import mimetypes
+from pathlib import Path
+
+from fastapi.requests import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 의존성 (없으면 gzip만 사용)
+    brotli = None
+
+
+# 압축 효과가 있는 텍스트 계열 MIME 타입
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+
+# 지문(fingerprint)이 붙은 파일은 내용이 바뀌면 URL도 바뀌므로 영구 캐시 가능
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# 지문 없는 경로와 HTML은 매번 ETag로 재검증
+REVALIDATE_CACHE = "no-cache"
+
+
+class CompressedAsset:
+    """메모리에 올려둔 정적 자원 (원본 + gzip/brotli 사전 압축본)"""
+
+    def __init__(self, content: bytes, media_type: str):
+        self.media_type = media_type
+        self.digest = hashlib.md5(content).hexdigest()[:10]
+        self.bodies = {"identity": content}
+
+        if media_type.startswith(COMPRESSIBLE_TYPES):
+            gz = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(gz) < len(content):
+                self.bodies["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(content, quality=11)
+                if len(br) < len(content):
+                    self.bodies["br"] = br
+
+    def etag(self, encoding: str) -> str:
+        """인코딩별로 다른 strong ETag"""
+        return f'"{self.digest}-{encoding}"'
+
+    def respond(self, request: Request, cache_control: str) -> Response:
+        """Accept-Encoding / If-None-Match 협상 후 응답 생성"""
+        encoding = self._negotiate(request.headers.get("accept-encoding", ""))
+        etag = self.etag(encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if request.method == "HEAD":
+            # HEAD는 본문 없이 GET과 같은 헤더만 반환
+            headers["Content-Length"] = str(len(self.bodies[encoding]))
+            return Response(media_type=self.media_type, headers=headers)
+        return Response(
+            content=self.bodies[encoding],
+            media_type=self.media_type,
+            headers=headers,
+        )
+
+    def _negotiate(self, accept_encoding: str) -> str:
+        """클라이언트가 받을 수 있는 가장 작은 압축본 선택"""
+        accepted = set()
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            params = params.strip().replace(" ", "")
+            if params.startswith("q="):
+                try:
+                    if float(params[2:]) == 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(name.strip().lower())
+
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+class StaticAssetManager:
+    """정적 파일 지문(content hash) 부여 및 사전 압축 서빙"""
+
+    def __init__(self, directory="static", url_prefix="/static"):
+        self.directory = Path(directory)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.assets = {}          # 원래 경로 -> CompressedAsset
+        self.fingerprinted = {}   # 지문 경로 -> 원래 경로
+        self.urls = {}            # 원래 경로 -> 지문 경로
+        self.build()
+
+    def build(self):
+        """static 디렉토리를 스캔하여 지문 생성 및 사전 압축"""
+        self.assets.clear()
+        self.fingerprinted.clear()
+        self.urls.clear()
+
+        for file_path in sorted(self.directory.rglob("*")):
+            if not file_path.is_file() or file_path.name.startswith("."):
+                continue
+
+            rel_path = file_path.relative_to(self.directory).as_posix()
+            media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+            asset = CompressedAsset(file_path.read_bytes(), media_type)
+
+            # style.css -> style.<hash>.css
+            hashed_name = f"{file_path.stem}.{asset.digest}{file_path.suffix}"
+            hashed_path = (Path(rel_path).parent / hashed_name).as_posix()
+
+            self.assets[rel_path] = asset
+            self.fingerprinted[hashed_path] = rel_path
+            self.urls[rel_path] = hashed_path
+
+        print(f"✓ 정적 파일 {len(self.assets)}개 지문/압축 완료 (brotli: {'사용' if brotli else '미사용'})")
+
+    def url(self, path: str) -> str:
+        """템플릿용 URL 생성 (지문 경로가 있으면 지문 경로 사용)"""
+        path = path.lstrip("/")
+        return f"{self.url_prefix}/{self.urls.get(path, path)}"
+
+    def response(self, request: Request, path: str) -> Response:
+        """요청 경로에 맞는 정적 파일 응답"""
+        if path in self.fingerprinted:
+            return self.assets[self.fingerprinted[path]].respond(request, IMMUTABLE_CACHE)
+        if path in self.assets:
+            return self.assets[path].respond(request, REVALIDATE_CACHE)
+        return Response(status_code=404)
+
+
+def report(directory="static"):
+    """사전 압축 결과 출력"""
+    manager = StaticAssetManager(directory)
+    for rel_path, asset in manager.assets.items():
+        sizes = ", ".join(f"{enc}={len(body)}B" for enc, body in asset.bodies.items())
+        print(f"  {manager.url(rel_path)}: {sizes}")
+
+
+if __name__ == "__main__":
+    report()
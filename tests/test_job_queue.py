@@ -0,0 +1,74 @@
+import asyncio
+import json
+import time
+
+from job_queue import DONE, FAILED, MAX_ATTEMPTS, RUNNING, JobQueue
+
+
+def run_jobs(tmp_path, handler, payloads, on_finish=None):
+    """워커 1개로 작업들을 순서대로 처리하고 최종 상태 반환"""
+    async def main():
+        queue = JobQueue(tmp_path / "jobs.db", workers=1)
+        await queue.start(handler, on_finish=on_finish)
+        try:
+            jobs = [queue.submit(queue.new_job_id(), payload) for payload in payloads]
+            results = [await queue.wait(job["job_id"], 5) for job in jobs]
+            # 워커 태스크가 예외로 죽지 않았는지 확인
+            assert not any(task.done() for task in queue._tasks)
+            return results
+        finally:
+            await queue.stop()
+
+    return asyncio.run(main())
+
+
+def test_one_worker_processes_consecutive_jobs(tmp_path):
+    async def handler(payload):
+        return {"n": payload["n"]}
+
+    results = run_jobs(tmp_path, handler, [{"n": 1}, {"n": 2}])
+
+    assert [job["status"] for job in results] == [DONE, DONE]
+    assert [job["result"] for job in results] == [{"n": 1}, {"n": 2}]
+
+
+def test_worker_survives_failed_job(tmp_path):
+    async def handler(payload):
+        if payload.get("fail"):
+            raise ValueError("boom")
+        return {"ok": True}
+
+    results = run_jobs(tmp_path, handler, [{"fail": True}, {}])
+
+    assert results[0]["status"] == FAILED
+    assert results[0]["error"] == "boom"
+    assert results[1]["status"] == DONE
+
+
+def test_on_finish_called_for_done_and_failed_jobs(tmp_path):
+    async def handler(payload):
+        if payload.get("fail"):
+            raise ValueError("boom")
+        return {"ok": True}
+
+    finished = []
+    results = run_jobs(tmp_path, handler, [{}, {"fail": True}], on_finish=finished.append)
+
+    assert finished == [job["job_id"] for job in results]
+
+
+def test_on_finish_called_when_retries_exhausted(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.db", workers=1)
+    finished = []
+    queue.on_finish = finished.append
+    # 임대가 만료된 채 재시도 횟수를 모두 쓴 작업 (소유 프로세스가 죽은 경우)
+    with queue._connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, status, payload, attempts, owner, lease_until, created_at, updated_at) "
+            "VALUES ('dead', ?, ?, ?, 'other', ?, 0, 0)",
+            (RUNNING, json.dumps({}), MAX_ATTEMPTS, time.time() - 1)
+        )
+
+    assert queue._claim() is None
+    assert queue.get("dead")["status"] == FAILED
+    assert finished == ["dead"]
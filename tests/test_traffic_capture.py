@@ -0,0 +1,17 @@
+import json
+
+from traffic_capture import TrafficRecorder, strip_image_metadata
+
+JPEG = b"\xff\xd8" + b"\xff\xe1\x00\x06Exif" + b"\xff\xda\x00\x02pixels\xff\xd9"
+
+
+def test_record_analyze_stores_given_bytes(tmp_path):
+    recorder = TrafficRecorder(tmp_path)
+    recorder.record_analyze({"tpo": "daily"}, {"outer": (JPEG, ".jpg")})
+    recorder._executor.shutdown(wait=True)
+
+    entry = json.loads((tmp_path / "requests.jsonl").read_text(encoding="utf-8"))
+    image = entry["images"]["outer"]
+    stored = (tmp_path / "images" / f"{image['sha256']}.jpg").read_bytes()
+    assert stored == strip_image_metadata(JPEG)
+    assert b"Exif" not in stored
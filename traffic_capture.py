@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+
+# 제거할 메타데이터 (위치, 기기 정보, 주석 등)
+JPEG_METADATA_MARKERS = {0xE1, 0xED, 0xFE}  # APP1(EXIF/XMP), APP13(IPTC), COM
+PNG_METADATA_CHUNKS = {b"eXIf", b"tEXt", b"zTXt", b"iTXt", b"tIME"}
+WEBP_METADATA_CHUNKS = {b"EXIF", b"XMP "}
+
+
+def strip_jpeg_metadata(data: bytes) -> bytes:
+    """JPEG의 EXIF/XMP/IPTC/주석 세그먼트 제거 (재인코딩 없이)"""
+    out = bytearray(data[:2])
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        if marker == 0xFF:  # 채움 바이트 (생략 가능)
+            pos += 1
+            continue
+        if marker == 0xDA:  # SOS 이후는 이미지 데이터
+            break
+        length = int.from_bytes(data[pos + 2:pos + 4], "big")
+        if marker not in JPEG_METADATA_MARKERS:
+            out += data[pos:pos + 2 + length]
+        pos += 2 + length
+    out += data[pos:]
+    return bytes(out)
+
+
+def strip_png_metadata(data: bytes) -> bytes:
+    """PNG의 eXIf/텍스트/시간 청크 제거"""
+    out = bytearray(data[:8])
+    pos = 8
+    while pos + 12 <= len(data):
+        length = int.from_bytes(data[pos:pos + 4], "big")
+        chunk_type = data[pos + 4:pos + 8]
+        chunk_end = pos + 12 + length
+        if chunk_type not in PNG_METADATA_CHUNKS:
+            out += data[pos:chunk_end]
+        pos = chunk_end
+        if chunk_type == b"IEND":
+            break
+    return bytes(out)
+
+
+def strip_webp_metadata(data: bytes) -> bytes:
+    """WebP(RIFF)의 EXIF/XMP 청크 제거 및 VP8X 플래그 정리"""
+    out = bytearray(data[:12])
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_type = data[pos:pos + 4]
+        size = int.from_bytes(data[pos + 4:pos + 8], "little")
+        chunk_end = pos + 8 + size + (size & 1)  # 청크는 짝수 길이로 패딩
+        if chunk_type == b"VP8X":
+            chunk = bytearray(data[pos:chunk_end])
+            chunk[8] &= ~(0x08 | 0x04) & 0xFF  # EXIF, XMP 존재 플래그 해제
+            out += chunk
+        elif chunk_type not in WEBP_METADATA_CHUNKS:
+            out += data[pos:chunk_end]
+        pos = chunk_end
+    out[4:8] = (len(out) - 8).to_bytes(4, "little")
+    return bytes(out)
+
+
+def strip_image_metadata(data: bytes):
+    """형식별 메타데이터 제거 (지원하지 않는 형식이면 None → 저장하지 않음)"""
+    if data.startswith(b"\xff\xd8"):
+        return strip_jpeg_metadata(data)
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return strip_png_metadata(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return strip_webp_metadata(data)
+    return None
+
+
+def _without_image_paths(value):
+    """서버 내부 경로(image_path) 제거"""
+    if isinstance(value, dict):
+        return {k: _without_image_paths(v) for k, v in value.items() if k != "image_path"}
+    if isinstance(value, list):
+        return [_without_image_paths(v) for v in value]
+    return value
+
+
+class TrafficRecorder:
+    """성능 회귀 테스트용 요청 기록 (replay_traffic.py로 재생)
+
+    - 이미지: images/<sha256>.<확장자> 로 내용 기반 저장 (같은 이미지는 한 번만)
+    - 요청: requests.jsonl 에 한 줄씩 (원본 파일명, 클라이언트 정보, 서버 경로는 기록하지 않음)
+    - 이미지 메타데이터(EXIF/XMP 등)는 JPEG/PNG/WebP에서 제거, 그 외 형식은 기록하지 않음
+    - 이미지는 요청 처리 중 받은 내용을 그대로 넘겨받음 (공유 업로드 경로를 다시 읽지 않음)
+    - 메타데이터 제거/해시/쓰기는 전용 스레드에서 처리하므로 요청 지연에 영향 없음
+    """
+
+    def __init__(self, capture_dir: str, sample_rate: float = 1.0):
+        self.capture_dir = Path(capture_dir)
+        self.images_dir = self.capture_dir / "images"
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.capture_dir / "requests.jsonl"
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        # 단일 스레드로 기록 순서 유지
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="traffic-capture")
+
+    @classmethod
+    def from_env(cls):
+        """CAPTURE_DIR 설정 시에만 생성"""
+        capture_dir = os.getenv("CAPTURE_DIR")
+        if not capture_dir:
+            return None
+        return cls(capture_dir, float(os.getenv("CAPTURE_SAMPLE_RATE", "1.0")))
+
+    def _store_image(self, content: bytes, ext: str) -> Dict[str, Any]:
+        data = strip_image_metadata(content)
+        if data is None:
+            raise ValueError(f"메타데이터를 제거할 수 없는 이미지 형식: {ext}")
+        digest = hashlib.sha256(data).hexdigest()
+        ext = ext or ".bin"
+        image_path = self.images_dir / f"{digest}{ext}"
+        if not image_path.exists():
+            image_path.write_bytes(data)
+        return {"sha256": digest, "ext": ext, "bytes": len(data)}
+
+    def _append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record_analyze(self, user_info: Dict[str, Any], images: Dict[str, Tuple[bytes, str]]):
+        """분석 요청 기록 예약 (즉시 반환)
+        
+        images: {카테고리: (업로드 내용, 확장자)}
+        """
+        if self._sampled():
+            self._executor.submit(self._write_analyze, round(time.time(), 3), dict(user_info), dict(images))
+
+    def record_re_recommend(self, body: Dict[str, Any]):
+        """재추천 요청 기록 예약 (즉시 반환)"""
+        if self._sampled():
+            self._executor.submit(self._write_re_recommend, round(time.time(), 3), body)
+
+    def _write_analyze(self, ts: float, user_info: Dict[str, Any], images: Dict[str, Tuple[bytes, str]]):
+        try:
+            self._append({
+                "ts": ts,
+                "endpoint": "/api/analyze",
+                "form": user_info,
+                "images": {category: self._store_image(content, ext)
+                           for category, (content, ext) in images.items()},
+            })
+        except Exception as e:
+            print(f"⚠ 요청 기록 실패: {e}")
+
+    def _write_re_recommend(self, ts: float, body: Dict[str, Any]):
+        try:
+            self._append({
+                "ts": ts,
+                "endpoint": "/api/re-recommend",
+                "json": _without_image_paths(body),
+            })
+        except Exception as e:
+            print(f"⚠ 요청 기록 실패: {e}")
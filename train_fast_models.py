@@ -0,0 +1,78 @@
+"""
+캐스케이드 1단계 경량 모델 학습
+
+전체 모델과 같은 데이터셋 폴더 구조(카테고리/클래스/이미지)를 사용하므로
+클래스 순서(알파벳순)가 전체 모델 레이블과 동일하게 맞춰짐.
+
+사용법: python train_fast_models.py <데이터셋 경로> [카테고리 ...]
+"""
+import argparse
+from pathlib import Path
+
+from tensorflow import keras
+
+from model_utils import ClothingClassifier, FAST_INPUT_SIZE
+
+
+def train_category(classifier, data_dir, category, epochs, model_dir):
+    """카테고리 하나의 경량 모델 학습 후 가중치 저장"""
+    category_dir = Path(data_dir) / category
+    train_ds, val_ds = keras.utils.image_dataset_from_directory(
+        category_dir,
+        label_mode="categorical",
+        image_size=FAST_INPUT_SIZE,
+        validation_split=0.2,
+        subset="both",
+        seed=42,
+    )
+
+    num_classes = len(train_ds.class_names)
+    expected = classifier.class_folders[category]
+    if train_ds.class_names != expected:
+        raise ValueError(f"{category}: 클래스 폴더 불일치 ({train_ds.class_names} != {expected})")
+
+    # 추론 시에는 Rescaling 레이어가 그래프 앞에 붙으므로 학습 데이터만 0~1로 정규화
+    rescale = lambda x, y: (x / 255.0, y)
+    train_ds = train_ds.map(rescale)
+    val_ds = val_ds.map(rescale)
+
+    model = classifier.create_fast_model_architecture(num_classes)
+    model.compile(
+        optimizer=keras.optimizers.Adam(1e-3),
+        loss="categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+
+    weights_path = Path(model_dir) / f"{category}_fast.weights.h5"
+    model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=epochs,
+        callbacks=[
+            keras.callbacks.ModelCheckpoint(
+                str(weights_path),
+                monitor="val_accuracy",
+                save_best_only=True,
+                save_weights_only=True,
+            )
+        ],
+    )
+    print(f"✓ {category} 경량 모델 저장: {weights_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐스케이드 경량 모델 학습")
+    parser.add_argument("data_dir", help="카테고리/클래스별 이미지 폴더")
+    parser.add_argument("categories", nargs="*",
+                        default=["outer", "inner1", "inner2", "bottom", "pattern"])
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--model-dir", default="models")
+    args = parser.parse_args()
+
+    classifier = ClothingClassifier(model_dir=args.model_dir)
+    for category in args.categories:
+        train_category(classifier, args.data_dir, category, args.epochs, args.model_dir)
+
+
+if __name__ == "__main__":
+    main()